@@ -0,0 +1,9 @@
+import sys
+
+collect_ignore = []
+if sys.version_info < (3, 3):
+    collect_ignore.append('fixturebuilder/test_sharded.py')
+if sys.version_info < (3, 5):
+    collect_ignore.extend(['fixturebuilder/test_async.py', 'fixturebuilder/test_export.py'])
+if sys.version_info < (3, 6):
+    collect_ignore.append('fixturebuilder/test_pytest_plugin.py')
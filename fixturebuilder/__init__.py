@@ -1,3 +1,3 @@
-from .fixturebuilder import FixtureBuilder, FixtureCollection
+from .fixturebuilder import FixtureBuilder, FixtureCollection, MissingPropertyError
 
-__all__ = ['FixtureBuilder', 'FixtureCollection']
+__all__ = ['FixtureBuilder', 'FixtureCollection', 'MissingPropertyError']
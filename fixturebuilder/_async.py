@@ -0,0 +1,63 @@
+"""
+coroutine support for value creators. Only imported on demand because it requires python 3.5+
+"""
+import asyncio
+
+
+async def _gather(values, concurrency):
+    """
+    awaits the coroutines creating all pending values concurrently.
+    values sharing a placeholder resolve to the same value
+    :param values: _Value[]
+    :param concurrency: int maximum number of creators running at the same time. None for no limit
+    :return: dict mapping id(_Value) to the created value
+    """
+    pending = list({id(value.awaiting): value.awaiting for value in values}.values())
+    semaphore = asyncio.Semaphore(concurrency) if concurrency is not None else None
+
+    async def call(placeholder):
+        if semaphore is None:
+            return await placeholder.awaitable()
+        async with semaphore:
+            return await placeholder.awaitable()
+
+    async def create(placeholder):
+        if placeholder.done:
+            return placeholder.result
+        # concurrent resolutions of the same placeholder wait for the same future
+        future = placeholder.future
+        if future is None:
+            future = placeholder.future = asyncio.ensure_future(call(placeholder))
+        try:
+            result = await future
+        except BaseException:
+            # a failed or cancelled creator is called again on the next resolution
+            if placeholder.future is future:
+                placeholder.future = None
+            raise
+        placeholder.result = result
+        placeholder.done = True
+        placeholder.future = None
+        return result
+
+    await asyncio.gather(*[create(placeholder) for placeholder in pending])
+    return {id(value): value.awaiting.result for value in values}
+
+
+async def resolve_builder(builder, concurrency=None):
+    resolved = await _gather(builder._pending_values(), concurrency)
+    return builder._resolved(resolved)
+
+
+async def resolve_collection(collection, concurrency=None):
+    builders = [builder for builder_list in collection.fixtures.values() for builder in builder_list]
+    resolved = await _gather([value for builder in builders for value in builder._pending_values()], concurrency)
+    fixtures = {
+        name: [builder._resolved(resolved) for builder in builder_list]
+        for name, builder_list in collection.fixtures.items()
+    }
+    return type(collection)(fixtures, collection._links_copy())
+
+
+async def resolve_collection_data(collection, concurrency=None):
+    return (await resolve_collection(collection, concurrency)).data
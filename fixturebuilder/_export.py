@@ -0,0 +1,97 @@
+"""
+encoding of fixture rows for bulk loading
+"""
+from datetime import date, datetime, time
+from json import dumps as json_encode
+
+_COPY_NULL = '\\N'
+_COPY_ESCAPES = {
+    '\\': '\\\\',
+    '\b': '\\b',
+    '\f': '\\f',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\t': '\\t',
+    '\v': '\\v',
+}
+_COPY_SPECIAL = frozenset(_COPY_ESCAPES)
+_CSV_SPECIAL = frozenset(',"\r\n')
+
+
+def _json_default(value):
+    if isinstance(value, (set, frozenset)):
+        try:
+            return sorted(value)
+        except TypeError:
+            return list(value)
+    if isinstance(value, (bytes, bytearray)):
+        return _bytea(value)
+    return str(value)
+
+
+def _bytea(value):
+    return '\\x' + bytes(value).hex()
+
+
+def _text(value):
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (bytes, bytearray)):
+        return _bytea(value)
+    if isinstance(value, (set, frozenset)):
+        value = _json_default(value)
+    if isinstance(value, (dict, list, tuple)):
+        text = json_encode(value, default=_json_default)
+    elif isinstance(value, (date, datetime, time)):
+        text = value.isoformat(' ') if isinstance(value, datetime) else value.isoformat()
+    else:
+        text = str(value)
+    if '\x00' in text:
+        raise ValueError('NUL characters cannot be loaded by bulk COPY: {!r}'.format(text[:50]))
+    return text
+
+
+def copy_field(value):
+    """
+    encodes a single value in PostgreSQL COPY text format
+    :param value:
+    :return: str
+    """
+    if value is None:
+        return _COPY_NULL
+    text = _text(value)
+    if _COPY_SPECIAL.isdisjoint(text):
+        return text
+    return ''.join(_COPY_ESCAPES.get(char, char) for char in text)
+
+
+def copy_line(row, columns):
+    """
+    :param row: dict
+    :param columns: str[]
+    :return: str tab separated line including the line break
+    """
+    return '\t'.join(copy_field(row.get(column)) for column in columns) + '\n'
+
+
+def csv_field(value):
+    """
+    encodes a single value as CSV field. NULL is an unquoted empty field, empty strings are quoted
+    :param value:
+    :return: str
+    """
+    if value is None:
+        return ''
+    text = _text(value)
+    if text == '' or not _CSV_SPECIAL.isdisjoint(text):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def csv_line(row, columns):
+    """
+    :param row: dict
+    :param columns: str[]
+    :return: str comma separated line including the line break
+    """
+    return ','.join(csv_field(row.get(column)) for column in columns) + '\r\n'
@@ -1,7 +1,11 @@
 
+from collections import OrderedDict
 from copy import deepcopy
 from json import dumps as json_encode
 
+import inspect
+import io
+import os
 import re
 
 
@@ -34,6 +38,114 @@ class _Location(object):
         return self._index is not None
 
 
+def _value_key(value):
+    """
+    returns a key that is only equal for values of the same type and representation.
+    values that merely compare equal, like 1 and True, 0.0 and -0.0 or datetimes in different timezones, differ.
+    :param value:
+    :return: tuple
+    """
+    if isinstance(value, tuple):
+        return type(value), tuple(_value_key(element) for element in value)
+    if isinstance(value, frozenset):
+        return type(value), frozenset(_value_key(element) for element in value)
+    return type(value), repr(value), value
+
+
+class MissingPropertyError(KeyError):
+    MAX_LISTED_KEYS = 10
+
+    def __init__(self, path, key, available):
+        """
+        raised when a property does not exist in a builder's data.
+        the message is only formatted when it is displayed.
+        :param path: list location of the dict inside the root builder's data
+        :param key: str the missing property
+        :param available: dict|list the dict the property was looked up in or its keys
+        """
+        super(MissingPropertyError, self).__init__(key)
+        self._path = path
+        self._key = key
+        self._available = available
+
+    @property
+    def path(self):
+        """
+        :return: list
+        """
+        return self._path
+
+    @property
+    def key(self):
+        """
+        :return: str
+        """
+        return self._key
+
+    @property
+    def available_keys(self):
+        """
+        :return: list
+        """
+        return list(self._available)
+
+    def __reduce__(self):
+        return type(self), (self._path, self._key, self.available_keys)
+
+    def __str__(self):
+        keys = sorted(str(key) for key in self._available)
+        listed = ', '.join(keys[:self.MAX_LISTED_KEYS])
+        if len(keys) > self.MAX_LISTED_KEYS:
+            listed += ', ... ({} more)'.format(len(keys) - self.MAX_LISTED_KEYS)
+        location = '.'.join(str(segment) for segment in self._path) or '<root>'
+        return 'attribute {} does not exist in {}. available attributes: {}'.format(self._key, location, listed)
+
+
+class _Pending(object):
+    def __init__(self, creator, awaitable=None):
+        """
+        placeholder for a value created by a coroutine
+        :param creator: callable
+        :param awaitable: awaitable already returned by the creator. None to call the creator on resolution
+        """
+        self._creator = creator
+        self._awaitable = awaitable
+        self.done = False
+        self.result = None
+        self.future = None
+
+    def awaitable(self):
+        """
+        returns the awaitable creating the value. The creator is called again on every call after the first
+        :return: awaitable
+        """
+        awaitable, self._awaitable = self._awaitable, None
+        if awaitable is None:
+            return self._creator()
+        return awaitable
+
+
+# inspect only knows about coroutines since python 3.5
+_iscoroutinefunction = getattr(inspect, 'iscoroutinefunction', lambda value: False)
+_iscoroutine = getattr(inspect, 'iscoroutine', lambda value: False)
+_isawaitable = getattr(inspect, 'isawaitable', lambda value: False)
+
+
+def _pending(creator, value):
+    if _iscoroutine(value):
+        # the coroutine has not started yet. It is created again when the value is resolved
+        value.close()
+        return _Pending(creator)
+    return _Pending(creator, value)
+
+
+def _create(creator):
+    value = creator()
+    if _isawaitable(value):
+        return _pending(creator, value)
+    return value
+
+
 class _Value(object):
     def __init__(self, creator, current_value):
         self._value_creator = creator
@@ -41,20 +153,52 @@ class _Value(object):
 
     @staticmethod
     def create(definition):
+        if _iscoroutinefunction(definition):
+            return _Value(definition, _Pending(definition))
         try:
-            return _Value(definition, definition())
+            value = definition()
         except TypeError:
             return _Value(lambda: definition, definition)
+        if _isawaitable(value):
+            return _Value(definition, _pending(definition, value))
+        return _Value(definition, value)
+
+    @property
+    def creator(self):
+        return self._value_creator
 
     @property
     def value(self):
+        if self.pending:
+            raise ValueError('value is created by a coroutine and not resolved yet. Use acopy() or aresolve()')
         return self._current_value
 
+    @property
+    def pending(self):
+        return isinstance(self._current_value, _Pending)
+
+    @property
+    def awaiting(self):
+        """
+        :return: _Pending placeholder of a value created by a coroutine, None if the value is resolved
+        """
+        return self._current_value if self.pending else None
+
     def copy(self, call_creator):
         if call_creator:
-            return _Value(self._value_creator, self._value_creator())
+            if self.pending or _iscoroutinefunction(self._value_creator):
+                return _Value(self._value_creator, _Pending(self._value_creator))
+            return _Value(self._value_creator, _create(self._value_creator))
         return _Value(self._value_creator, self._current_value)
 
+    def resolve(self, value):
+        return _Value(self._value_creator, value)
+
+
+def _check_concurrency(concurrency):
+    if concurrency is not None and concurrency < 1:
+        raise ValueError('concurrency must be at least 1 or None for no limit')
+
 
 class FixtureBuilder(object):
     def __init__(self, data, parent, location):
@@ -94,6 +238,19 @@ class FixtureBuilder(object):
         """
         return self._parent
 
+    @property
+    def path(self):
+        """
+        location of this builder's data inside the root builder's data
+        :return: list
+        """
+        if self._parent is None:
+            return []
+        path = self._parent.path + [self._location.prop_name]
+        if self._location.has_index:
+            path.append(self._location.index)
+        return path
+
     @property
     def data(self):
         """
@@ -116,7 +273,33 @@ class FixtureBuilder(object):
         :param prop_name: str
         :return:
         """
-        return self._unwrap(self._data[prop_name])
+        return self._unwrap(self._lookup(prop_name))
+
+    def has(self, path):
+        """
+        checks if a property exists
+        :param path: str|list property name, dotted path :code:`dict1.list1.0.prop1` or list of keys and indexes
+        :return: bool
+        """
+        if not isinstance(path, (list, tuple)):
+            path = str(path).split('.')
+        values = self._data
+        for segment in path:
+            if isinstance(values, dict):
+                try:
+                    if segment not in values:
+                        return False
+                except TypeError:
+                    return False
+                values = values[segment]
+            elif isinstance(values, list):
+                try:
+                    values = values[int(segment)]
+                except (TypeError, ValueError, IndexError):
+                    return False
+            else:
+                return False
+        return True
 
     def set(self, prop_name, value):
         """
@@ -125,8 +308,7 @@ class FixtureBuilder(object):
         :param value:
         :return: FixtureBuilder
         """
-        if prop_name not in self._data:
-            raise KeyError('attribute {} does not exist in {}'.format(prop_name, json_encode(self.data)))
+        self._lookup(prop_name)
         data = self._deepcopy(self._data)
         data[prop_name] = self._wrap(value)
         return FixtureBuilder(data, self.parent, self.location)
@@ -149,8 +331,7 @@ class FixtureBuilder(object):
         :param value:
         :return: FixtureBuilder
         """
-        if prop_name not in self._data:
-            raise KeyError('attribute {} does not exist in {}'.format(prop_name, json_encode(self.data)))
+        self._lookup(prop_name)
         data = self._deepcopy(self._data)
         data[prop_name].append(self._wrap(value))
         return FixtureBuilder(data, self.parent, self.location)
@@ -161,7 +342,7 @@ class FixtureBuilder(object):
         :param prop_name: str
         :return: FixtureBuilder
         """
-        if not isinstance(self._data[prop_name], dict):
+        if not isinstance(self._lookup(prop_name), dict):
             raise AttributeError('dict operations are not supported on property {}'.format(prop_name))
         return FixtureBuilder(self._data[prop_name], self, _Location(prop_name))
 
@@ -172,7 +353,7 @@ class FixtureBuilder(object):
         :param index: int
         :return: FixtureBuilder
         """
-        if not isinstance(self._data[prop_name], list):
+        if not isinstance(self._lookup(prop_name), list):
             raise AttributeError('prop {} is not a list'.format(prop_name))
         element = self._data[prop_name][index]
         if not isinstance(element, dict):
@@ -213,6 +394,81 @@ class FixtureBuilder(object):
             raise NotImplementedError('creating copy of a non root FixutreBuilder is not supported')
         return FixtureBuilder.create(self._deepcopy(self._data, True))
 
+    def acopy(self, concurrency=None):
+        """
+        returns an awaitable resolving to a copy of this FixtureBuilder.
+        synchronous value creators are called directly, coroutine value creators are awaited concurrently.
+        requires python 3.5+
+        :param concurrency: int maximum number of creator coroutines running at the same time. None for no limit
+        :return: awaitable FixtureBuilder
+        """
+        return self.copy().aresolve(concurrency)
+
+    def aresolve(self, concurrency=None):
+        """
+        returns an awaitable resolving to a FixtureBuilder with all values of coroutine value creators resolved.
+        requires python 3.5+
+        :param concurrency: int maximum number of creator coroutines running at the same time. None for no limit
+        :return: awaitable FixtureBuilder
+        """
+        from ._async import resolve_builder
+        _check_concurrency(concurrency)
+        return resolve_builder(self, concurrency)
+
+    def _pending_values(self, values=None):
+        if values is None:
+            values = self._data
+        if isinstance(values, dict):
+            return [pending for value in values.values() for pending in self._pending_values(value)]
+        if isinstance(values, list):
+            return [pending for value in values for pending in self._pending_values(value)]
+        return [values] if values.pending else []
+
+    def _resolved(self, resolved):
+        """
+        returns a copy of this builder with pending values replaced by their resolved values
+        :param resolved: dict mapping id(_Value) to the value created by its creator
+        :return: FixtureBuilder
+        """
+        def replace(values):
+            if isinstance(values, dict):
+                return {key: replace(value) for key, value in values.items()}
+            if isinstance(values, list):
+                return [replace(value) for value in values]
+            if id(values) in resolved:
+                return values.resolve(resolved[id(values)])
+            return values
+        return FixtureBuilder(replace(self._data), self.parent, self.location)
+
+    def _lookup(self, prop_name):
+        try:
+            return self._data[prop_name]
+        except KeyError:
+            raise MissingPropertyError(self.path, prop_name, self._data)
+
+    def _structure_key(self):
+        """
+        returns a hashable key identifying this builder's structure and the values held by it.
+        builders sharing the same structure and the same values produce the same key.
+        :return: tuple
+        """
+        return self._key(self._data)
+
+    def _key(self, values):
+        if isinstance(values, dict):
+            return dict, frozenset((key, self._key(value)) for key, value in values.items())
+        if isinstance(values, list):
+            return list, tuple(self._key(value) for value in values)
+        if values.pending:
+            return id(values)
+        key = _value_key(values.value)
+        try:
+            hash(key)
+        except TypeError:
+            # unhashable values can only be told apart by identity
+            return id(values.value)
+        return key
+
     def _deepcopy(self, values, call_creators=False):
         if isinstance(values, dict):
             return {key: self._deepcopy(value, call_creators) for key, value in values.items()}
@@ -237,6 +493,182 @@ class FixtureBuilder(object):
         return values.value
 
 
+_LINK_NAME = re.compile(r'^[a-z0-9_]+\.[a-z0-9_]+(,[a-z0-9_]+)*$', flags=re.IGNORECASE)
+_LINKED_FIELD = re.compile(r'^[a-z0-9_]+\.[a-z0-9_]+(,[a-z0-9_]+)*=')
+
+
+def _normalize(values):
+    return tuple(str(value) for value in values)
+
+
+def _link_values(linked_fields, value):
+    """
+    normalizes the values identifying a linked row
+    :param linked_fields: tuple
+    :param value: value of a single field, or comma separated str or sequence of values for composite keys
+    :return: tuple
+    """
+    if len(linked_fields) == 1:
+        return _normalize([value])
+    if value == '':
+        return ('',) * len(linked_fields)
+    values = _normalize(value.split(',') if isinstance(value, str) else value)
+    if len(values) != len(linked_fields):
+        raise ValueError('expected {} values to link to, got {}'.format(len(linked_fields), value))
+    return values
+
+
+class _Link(object):
+    def __init__(self, target_fields, linked_fixture, linked_fields, linked_values, row_values):
+        """
+        initializes a new compiled link. Use _Link.parse() to create links from their string definition.
+        :param target_fields: tuple fields set on the linking fixture
+        :param linked_fixture: str
+        :param linked_fields: tuple fields read from the linked fixture
+        :param linked_values: tuple normalized values identifying the linked row
+        :param row_values: tuple normalized values identifying the linked row, one per row of the linking fixture,
+            or callable returning the values for a row of the linking fixture
+        """
+        self._target_fields = target_fields
+        self._linked_fixture = linked_fixture
+        self._linked_fields = linked_fields
+        self._linked_values = linked_values
+        self._row_values = row_values
+        self._unbound = row_values is None and all(value == '' for value in linked_values)
+
+    @staticmethod
+    def parse(link_name, linked_field, row_values=None):
+        """
+        parses a link definition
+        :param link_name: str definition of the link to set up :code:`table_name.field_name`
+        :param linked_field: str definition of the field to link to :code:`table_name.field_name=target_value`
+        :param row_values: list values identifying the linked row, one per row of the linking fixture,
+            or callable taking the position of a row of the linking fixture and returning its value
+        :return: tuple name of the fixture the link is set up on and the _Link
+        """
+        if not _LINK_NAME.match(link_name):
+            raise ValueError('link_name does not match expected format ({})'.format(_LINK_NAME.pattern))
+        if linked_field.find('=') == -1:
+            linked_field += '='
+        if not _LINKED_FIELD.match(linked_field):
+            raise ValueError('linked_field does not match expected format ({})'.format(_LINKED_FIELD.pattern))
+
+        target_fixture, target_fields = link_name.split('.')
+        link_def, linked_value = linked_field.split('=', 1)
+        linked_fixture, linked_fields = link_def.split('.')
+        target_fields = tuple(target_fields.split(','))
+        linked_fields = tuple(linked_fields.split(','))
+        if len(target_fields) != len(linked_fields):
+            raise ValueError('link_name and linked_field must name the same number of fields')
+
+        if row_values is not None:
+            if linked_value != '':
+                raise ValueError('a link either uses a target value or row_values, not both')
+            if not callable(row_values):
+                row_values = tuple(_link_values(linked_fields, value) for value in row_values)
+        linked_values = _link_values(linked_fields, linked_value)
+        return target_fixture, _Link(target_fields, linked_fixture, linked_fields, linked_values, row_values)
+
+    @property
+    def target_fields(self):
+        """
+        :return: tuple
+        """
+        return self._target_fields
+
+    @property
+    def linked_fixture(self):
+        """
+        :return: str
+        """
+        return self._linked_fixture
+
+    @property
+    def linked_fields(self):
+        """
+        :return: tuple
+        """
+        return self._linked_fields
+
+    @property
+    def structure_key(self):
+        """
+        :return: tuple
+        """
+        return self._target_fields, self._linked_fixture, self._linked_fields, self._linked_values, self._row_values
+
+    def wanted_keys(self, linked_rows, rows):
+        """
+        returns the keys of the linked rows this link resolves to
+        :param linked_rows: int number of rows in the linked fixture
+        :param rows: int number of rows in the linking fixture
+        :return: set
+        """
+        if self._row_values is not None:
+            return {self.lookup_key(position, linked_rows) for position in range(rows)}
+        return {self.lookup_key(0, linked_rows)}
+
+    def lookup_key(self, row_index, linked_rows):
+        """
+        returns the key of the linked row for a row of the linking fixture.
+        None refers to the only row of a single row fixture.
+        :param row_index: int row of the linking fixture
+        :param linked_rows: int number of rows in the linked fixture
+        :return: tuple
+        """
+        if self._unbound and linked_rows == 1:
+            return None
+        if callable(self._row_values):
+            return _link_values(self._linked_fields, self._row_values(row_index))
+        if self._row_values is not None:
+            return self._row_values[row_index]
+        return self._linked_values
+
+    def check_rows(self, name, rows):
+        """
+        makes sure per row values match the number of rows in the linking fixture
+        :param name: str linking fixture
+        :param rows: int
+        """
+        if isinstance(self._row_values, tuple) and len(self._row_values) != rows:
+            raise ValueError('link from {} defines {} row values for {} rows'.format(name, len(self._row_values), rows))
+
+    def linked_values(self, row, position):
+        """
+        returns the values of the linked fields of a row of the linked fixture
+        :param row: dict
+        :param position: int row of the linked fixture
+        :return: tuple
+        """
+        try:
+            return tuple(row[field] for field in self._linked_fields)
+        except KeyError as error:
+            raise MissingPropertyError([self._linked_fixture, position], error.args[0], list(row))
+
+    def index_row(self, index, row, position):
+        """
+        adds a row of the linked fixture to a key index. The first row matching a key wins.
+        :param index: dict mapping keys to the values of the linked fields
+        :param row: dict
+        :param position: int row of the linked fixture
+        """
+        values = self.linked_values(row, position)
+        if position == 0:
+            index.setdefault(None, values)
+        index.setdefault(_normalize(values), values)
+
+    def apply(self, row, values):
+        """
+        sets the linked values on a row of the linking fixture.
+        dicts and lists are copied, so linking and linked rows stay independent.
+        :param row: dict
+        :param values: tuple values of the linked fields or None if no row matched
+        """
+        for position, field in enumerate(self._target_fields):
+            value = None if values is None else values[position]
+            row[field] = deepcopy(value) if isinstance(value, (dict, list)) else value
+
+
 class FixtureCollection(object):
     def __init__(self, fixtures, links):
         self._fixtures = fixtures
@@ -258,26 +690,32 @@ class FixtureCollection(object):
         """
         :return: dict all the data inside the collection
         """
-        def find_linked_value(definition):
-            if definition['linked_value'] == '' and len(self._fixtures[definition['linked_fixture']]) == 1:
-                return self._fixtures[definition['linked_fixture']][0].get(definition['linked_field'])
-
-            for fix in self._fixtures[definition['linked_fixture']]:
-                value = fix.get(definition['linked_field'])
-                if str(value) == str(definition['linked_value']):
-                    return value
-
-        d = {}
-        for key, builder_list in self._fixtures.items():
-            d[key] = []
-            for element in builder_list:
-                data = element.data
-                if key in self._links:
-                    for definition in self._links[key]:
-                        value = find_linked_value(definition)
-                        data[definition['target_field']] = value
-                d[key].append(data)
-        return d
+        d = {key: [element.data for element in builder_list] for key, builder_list in self._fixtures.items()}
+        indexes = self._link_indexes(d, lambda name: d[name])
+        return {key: list(self._linked_rows(key, rows, indexes)) for key, rows in d.items()}
+
+    def adata(self, concurrency=None):
+        """
+        returns an awaitable resolving to the data inside the collection.
+        values of coroutine value creators in all fixtures are resolved concurrently.
+        requires python 3.5+
+        :param concurrency: int maximum number of creator coroutines running at the same time. None for no limit
+        :return: awaitable dict
+        """
+        from ._async import resolve_collection_data
+        _check_concurrency(concurrency)
+        return resolve_collection_data(self, concurrency)
+
+    def aresolve(self, concurrency=None):
+        """
+        returns an awaitable resolving to a FixtureCollection with all values of coroutine value creators resolved
+        requires python 3.5+
+        :param concurrency: int maximum number of creator coroutines running at the same time. None for no limit
+        :return: awaitable FixtureCollection
+        """
+        from ._async import resolve_collection
+        _check_concurrency(concurrency)
+        return resolve_collection(self, concurrency)
 
     def get_fixture(self, name):
         """
@@ -304,38 +742,140 @@ class FixtureCollection(object):
         fixtures[name].append(builder)
         return FixtureCollection(fixtures, self._links_copy())
 
-    def add_link(self, link_name, linked_field):
+    def add_link(self, link_name, linked_field, row_values=None):
         """
-        Adds a link between fixtures
+        Adds a link between fixtures.
+        Composite keys list several comma separated fields and values :code:`table_name.field1,field2=value1,value2`
         :param link_name: str definition of the link to set up :code:`table_name.field_name`
         :param linked_field: str definition of the field to link to :code:`table_name.field_name=target_value`
+        :param row_values: list target values, one per row of the linking fixture. Replaces :code:`=target_value`.
+            A callable taking the position of a row and returning its target value is called once per row instead
         :return: FixtureCollection
         """
-        link_name_regexp = '^[a-z0-9_]+\.[a-z0-9_]+$'
-        linked_field_regexp = '^[a-z0-9_]+\.[a-z0-9_]+='
-        if not re.match(link_name_regexp, link_name, flags=re.IGNORECASE):
-            raise ValueError('link_name does not match expected format ({})'.format(link_name_regexp))
-        if linked_field.find('=') == -1:
-            linked_field += '='
-        if not re.match(linked_field_regexp, linked_field):
-            raise ValueError('linked_field does not match expected format ({})'.format(link_name_regexp))
-
-        target_fixture, target_field = link_name.split('.')
-        link_def, linked_value = linked_field.split('=')
-        linked_fixture, linked_field = link_def.split('.')
+        target_fixture, link = _Link.parse(link_name, linked_field, row_values)
         links = self._links_copy()
         if target_fixture not in links:
             links[target_fixture] = []
-        links[target_fixture].append({
-            'target_field': target_field,
-            'linked_fixture': linked_fixture,
-            'linked_field': linked_field,
-            'linked_value': linked_value,
-        })
+        links[target_fixture].append(link)
         return FixtureCollection(self._fixtures_copy(), links)
 
+    def fixture_columns(self, name):
+        """
+        returns the columns of a fixture in a stable order.
+        properties appear in the order they are first seen in the fixture's rows, followed by link target fields.
+        :param name: str
+        :return: str[]
+        """
+        columns = OrderedDict()
+        for builder in self._fixtures[name]:
+            for key in builder._data:
+                columns[key] = True
+        for link in self._links.get(name, []):
+            for field in link.target_fields:
+                columns[field] = True
+        return list(columns)
+
+    def write_copy(self, name, fp, columns=None):
+        """
+        streams a fixture to a file in PostgreSQL COPY text format. Rows are created one at a time from the builders.
+        :param name: str
+        :param fp: file object opened in text mode
+        :param columns: str[] columns to write. Defaults to fixture_columns()
+        :return: str[] the written columns
+        """
+        from ._export import copy_line
+        columns = columns or self.fixture_columns(name)
+        for row in self._stream_rows(name):
+            fp.write(copy_line(row, columns))
+        return columns
+
+    def write_csv(self, name, fp, columns=None, header=True):
+        """
+        streams a fixture to a file as CSV. NULL is written as an unquoted empty field, empty strings are quoted.
+        :param name: str
+        :param fp: file object opened in text mode with newline=''
+        :param columns: str[] columns to write. Defaults to fixture_columns()
+        :param header: bool write the column names as first line
+        :return: str[] the written columns
+        """
+        from ._export import csv_line
+        columns = columns or self.fixture_columns(name)
+        if header:
+            fp.write(csv_line(dict(zip(columns, columns)), columns))
+        for row in self._stream_rows(name):
+            fp.write(csv_line(row, columns))
+        return columns
+
+    def write_csv_dir(self, path, header=True):
+        """
+        streams every fixture to a CSV file named after the fixture inside a directory
+        :param path: str directory, created if missing
+        :param header: bool write the column names as first line
+        :return: dict fixture name to file path
+        """
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        files = {}
+        for name in sorted(self._fixtures):
+            files[name] = os.path.join(path, '{}.csv'.format(name))
+            with io.open(files[name], 'w', encoding='utf-8', newline='') as fp:
+                self.write_csv(name, fp, header=header)
+        return files
+
+    def _stream_rows(self, name):
+        def rows_of(fixture):
+            return (builder.data for builder in self._fixtures[fixture])
+        indexes = self._link_indexes({name: self._fixtures[name]}, rows_of)
+        return self._linked_rows(name, rows_of(name), indexes)
+
+    def _link_indexes(self, fixtures, rows_of):
+        """
+        builds the key indexes for all links set up on the given fixtures, in one pass per linked fixture
+        :param fixtures: iterable names of the linking fixtures
+        :param rows_of: callable returning the rows of a fixture
+        :return: dict mapping linked fixture and fields to a key index
+        """
+        linked = OrderedDict()
+        for name in fixtures:
+            for link in self._links.get(name, []):
+                linked.setdefault(link.linked_fixture, OrderedDict()).setdefault(link.linked_fields, link)
+        indexes = {}
+        for linked_fixture, links in linked.items():
+            for fields in links:
+                indexes[(linked_fixture, fields)] = {}
+            for position, row in enumerate(rows_of(linked_fixture)):
+                for fields, link in links.items():
+                    link.index_row(indexes[(linked_fixture, fields)], row, position)
+        return indexes
+
+    def _linked_rows(self, name, rows, indexes):
+        links = []
+        for link in self._links.get(name, []):
+            link.check_rows(name, len(self._fixtures[name]))
+            links.append((link, indexes[(link.linked_fixture, link.linked_fields)],
+                          len(self._fixtures[link.linked_fixture])))
+        for position, row in enumerate(rows):
+            for link, index, linked_rows in links:
+                link.apply(row, index.get(link.lookup_key(position, linked_rows)))
+            yield row
+
+    def _structure_key(self):
+        """
+        returns a hashable key identifying the fixtures and links of this collection
+        :return: tuple
+        """
+        fixtures = frozenset(
+            (name, tuple(builder._structure_key() for builder in builder_list))
+            for name, builder_list in self._fixtures.items()
+        )
+        links = frozenset(
+            (name, tuple(link.structure_key for link in links))
+            for name, links in self._links.items()
+        )
+        return fixtures, links
+
     def _fixtures_copy(self):
         return {key: val for key, val in self._fixtures.items()}
 
     def _links_copy(self):
-        return {key: deepcopy(link) for key, link in self._links.items()}
\ No newline at end of file
+        return {key: list(links) for key, links in self._links.items()}
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""
+pytest integration for fixturebuilder.
+
+Registers FixtureBuilders and FixtureCollections as scoped pytest resources.
+The materialized data is built once per scope, cached by the structure of the builder
+and handed to every test as a private copy or a read-only view.
+"""
+from copy import deepcopy
+from timeit import default_timer
+
+import pytest
+
+from .fixturebuilder import FixtureBuilder, FixtureCollection
+
+
+class _FrozenDict(dict):
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('fixture data is read-only. Use copy=True to receive a modifiable copy')
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return _thaw(self)
+
+
+class _FrozenList(list):
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('fixture data is read-only. Use copy=True to receive a modifiable copy')
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = clear = extend = insert = pop = remove = reverse = sort = _readonly
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return _thaw(self)
+
+
+def _freeze(values):
+    if isinstance(values, dict):
+        return _FrozenDict((key, _freeze(value)) for key, value in values.items())
+    if isinstance(values, list):
+        return _FrozenList(_freeze(value) for value in values)
+    if isinstance(values, set):
+        return frozenset(values)
+    if isinstance(values, bytearray):
+        return bytes(values)
+    return values
+
+
+def _thaw(values):
+    if isinstance(values, dict):
+        return {key: _thaw(value) for key, value in values.items()}
+    if isinstance(values, list):
+        return [_thaw(value) for value in values]
+    return deepcopy(values)
+
+
+class _BuildStats(object):
+    def __init__(self):
+        self.builds = 0
+        self.hits = 0
+        self.seconds = 0.0
+
+
+class FixtureCache(object):
+    def __init__(self):
+        """
+        initializes an empty cache. One cache is created per pytest session.
+        """
+        self._sources = {}
+        self._entries = {}
+        self._stats = {}
+
+    @property
+    def stats(self):
+        """
+        build statistics per fixture name
+        :return: dict
+        """
+        return self._stats
+
+    def get(self, name, scope_key, factory, copy=False):
+        """
+        returns the materialized data for a fixture, building it on the first request in a scope
+        :param name: str name of the pytest fixture
+        :param scope_key: hashable identifying the scope instance (module, class, ...)
+        :param factory: callable returning a FixtureBuilder or FixtureCollection
+        :param copy: bool return a modifiable deep copy instead of the shared read-only view
+        :return: dict
+        """
+        stats = self._stats.setdefault(name, _BuildStats())
+        source_key = (name, scope_key, factory)
+        if source_key not in self._sources:
+            start = default_timer()
+            source = factory()
+            if not isinstance(source, (FixtureBuilder, FixtureCollection)):
+                raise TypeError('fixture {} must return a FixtureBuilder or FixtureCollection'.format(name))
+            self._sources[source_key] = source, source._structure_key()
+            stats.seconds += default_timer() - start
+
+        source, key = self._sources[source_key]
+        if key in self._entries:
+            stats.hits += 1
+        else:
+            start = default_timer()
+            # the source is kept alive alongside the data so ids of unhashable values inside the key cannot be reused
+            self._entries[key] = [source, source.data, None]
+            stats.builds += 1
+            stats.seconds += default_timer() - start
+
+        entry = self._entries[key]
+        if copy:
+            return deepcopy(entry[1])
+        if entry[2] is None:
+            entry[2] = _freeze(entry[1])
+        return entry[2]
+
+    def contains(self, name, scope_key, factory):
+        """
+        checks if the factory of a fixture was already called in a scope
+        :param name: str name of the pytest fixture
+        :param scope_key: hashable identifying the scope instance
+        :param factory: callable
+        :return: bool
+        """
+        return (name, scope_key, factory) in self._sources
+
+    def evict(self, name, scope_key, factory):
+        """
+        drops a fixture built for a scope. The data is dropped once no other scope uses it.
+        :param name: str name of the pytest fixture
+        :param scope_key: hashable identifying the scope instance
+        :param factory: callable
+        """
+        _, key = self._sources.pop((name, scope_key, factory), (None, None))
+        if key in self._entries and all(other != key for _, other in self._sources.values()):
+            del self._entries[key]
+
+
+def _scope_key(request, scope):
+    if scope == 'session':
+        return None
+    if scope == 'package':
+        return request.module.__name__.rpartition('.')[0]
+    if scope == 'class' and request.cls is not None:
+        return request.cls
+    if scope in ('module', 'class'):
+        return request.module.__name__
+    raise ValueError('unsupported scope {}'.format(scope))
+
+
+def _scope_node(request, scope):
+    if scope == 'package':
+        return request.node.getparent(pytest.Package)
+    if scope == 'class' and request.cls is not None:
+        return request.node.getparent(pytest.Class)
+    if scope in ('module', 'class'):
+        return request.node.getparent(pytest.Module)
+    return None
+
+
+def fixture_data(name, factory, scope='session', copy=True):
+    """
+    declares a pytest fixture providing the data of a FixtureBuilder or FixtureCollection.
+    Assign the result to a module level name in a test module or conftest.py.
+
+    :param name: str name of the pytest fixture
+    :param factory: callable returning a FixtureBuilder or FixtureCollection
+    :param scope: str one of session, package, module, class. The factory is called once per scope
+    :param copy: bool hand each test a modifiable deep copy. If False tests receive a read-only view
+    :return: pytest fixture function
+    """
+    if scope not in ('session', 'package', 'module', 'class'):
+        raise ValueError('unsupported scope {}'.format(scope))
+
+    @pytest.fixture(name=name)
+    def _fixture(request):
+        cache = _fixture_cache(request.config)
+        scope_key = _scope_key(request, scope)
+        if not cache.contains(name, scope_key, factory):
+            node = _scope_node(request, scope)
+            if node is not None:
+                node.addfinalizer(lambda: cache.evict(name, scope_key, factory))
+        return cache.get(name, scope_key, factory, copy)
+
+    return _fixture
+
+
+def _fixture_cache(config):
+    cache = getattr(config, '_fixturebuilder_cache', None)
+    if cache is None:
+        cache = FixtureCache()
+        config._fixturebuilder_cache = cache
+    return cache
+
+
+def pytest_configure(config):
+    _fixture_cache(config)
+
+
+def pytest_terminal_summary(terminalreporter):
+    cache = getattr(terminalreporter.config, '_fixturebuilder_cache', None)
+    if cache is None or not cache.stats:
+        return
+    terminalreporter.write_sep('-', 'fixturebuilder build times')
+    for name, stats in sorted(cache.stats.items()):
+        terminalreporter.write_line('{:<40} {:>10.4f}s  builds: {}  cache hits: {}'.format(
+            name, stats.seconds, stats.builds, stats.hits))
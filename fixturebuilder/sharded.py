@@ -0,0 +1,241 @@
+"""
+sharded generation of very large fixtures.
+
+A ShardedCollection is defined by one template per fixture and the number of rows to generate from it.
+Rows are generated in fixed-size shards that are written to disk, so only one shard is held in memory.
+Links are resolved through a compact index holding only the key values that are actually linked to.
+"""
+from collections import OrderedDict
+from shutil import rmtree
+from tempfile import mkdtemp
+
+import os
+import pickle
+
+from .fixturebuilder import FixtureBuilder, _Link, _normalize
+
+
+class ShardedCollection(object):
+    def __init__(self, templates, links, shard_size):
+        """
+        initializes a new collection. should not be called directly. Use ShardedCollection.create() instead.
+        :param templates: OrderedDict fixture name to tuple of template FixtureBuilder and row count
+        :param links: dict fixture name to list of _Link
+        :param shard_size: int
+        """
+        self._templates = templates
+        self._links = links
+        self._shard_size = shard_size
+
+    @staticmethod
+    def create(shard_size=10000):
+        """
+        create a new sharded collection
+        :param shard_size: int number of rows written to a single shard
+        :return: ShardedCollection
+        """
+        if shard_size < 1:
+            raise ValueError('shard_size must be at least 1')
+        return ShardedCollection(OrderedDict(), {}, shard_size)
+
+    @property
+    def shard_size(self):
+        """
+        :return: int
+        """
+        return self._shard_size
+
+    def add_template(self, name, definition, rows):
+        """
+        adds a fixture generated from a template.
+        every row is a copy of the template, getting new values from value creators.
+        :param name: name for the fixture inside the collection
+        :param definition: dict|FixtureBuilder template of a single row
+        :param rows: int number of rows to generate
+        :return: ShardedCollection
+        """
+        if name in self._templates:
+            raise ValueError('template {} already exists'.format(name))
+        if isinstance(definition, FixtureBuilder):
+            builder = definition
+        else:
+            builder = FixtureBuilder.create(definition)
+        templates = OrderedDict(self._templates)
+        templates[name] = (builder, rows)
+        return ShardedCollection(templates, self._links_copy(), self._shard_size)
+
+    def add_link(self, link_name, linked_field, row_values=None):
+        """
+        Adds a link between fixtures. Uses the same format as FixtureCollection.add_link()
+        :param link_name: str definition of the link to set up :code:`table_name.field_name`
+        :param linked_field: str definition of the field to link to :code:`table_name.field_name=target_value`
+        :param row_values: list target values, one per row of the linking fixture. Replaces :code:`=target_value`.
+            For large fixtures pass a callable taking the position of a row and returning its target value,
+            so the values are never held in memory. It must return the same value for the same position
+        :return: ShardedCollection
+        """
+        target_fixture, link = _Link.parse(link_name, linked_field, row_values)
+        links = self._links_copy()
+        links.setdefault(target_fixture, []).append(link)
+        return ShardedCollection(OrderedDict(self._templates), links, self._shard_size)
+
+    def generate(self, directory=None):
+        """
+        generates all fixtures shard by shard and writes them to disk.
+        fixtures are generated in link order, linked fixtures first.
+        :param directory: str directory to write the shards to. A temporary directory is created if omitted
+        :return: ShardedData
+        """
+        owns_directory = directory is None
+        if owns_directory:
+            directory = mkdtemp(prefix='fixturebuilder-')
+        try:
+            shards = self._generate(directory)
+        except Exception:
+            if owns_directory:
+                rmtree(directory, ignore_errors=True)
+            raise
+        return ShardedData(directory, shards, owns_directory)
+
+    def _generate(self, directory):
+        index = {}
+        shards = OrderedDict()
+        for name in self._generation_order():
+            builder, rows = self._templates[name]
+            fixture_dir = os.path.join(directory, name)
+            if not os.path.isdir(fixture_dir):
+                os.makedirs(fixture_dir)
+            wanted = {}
+            for target_fixture, links in self._links.items():
+                for link in links:
+                    if link.linked_fixture == name:
+                        keys = wanted.setdefault(link.linked_fields, (link, set()))[1]
+                        keys.update(link.wanted_keys(rows, self._templates[target_fixture][1]))
+            outgoing = []
+            for link in self._links.get(name, []):
+                link.check_rows(name, rows)
+                outgoing.append((link, index[(link.linked_fixture, link.linked_fields)],
+                                 self._templates[link.linked_fixture][1]))
+
+            for fields in wanted:
+                index[(name, fields)] = {}
+            paths = []
+            for shard in range(-(-rows // self._shard_size)):
+                path = os.path.join(fixture_dir, '{:08d}.pickle'.format(shard))
+                found = self._write_shard(path, builder, rows, shard * self._shard_size, outgoing, wanted)
+                paths.append(path)
+                for fields, keys in found.items():
+                    for key, values in keys.items():
+                        index[(name, fields)].setdefault(key, values)
+            shards[name] = (paths, rows)
+        return shards
+
+    def _write_shard(self, path, builder, rows, first_row, outgoing, wanted):
+        found = {fields: {} for fields in wanted}
+        data = []
+        for position in range(first_row, min(first_row + self._shard_size, rows)):
+            row = builder.copy().data
+            for fields, (link, keys) in wanted.items():
+                values = link.linked_values(row, position)
+                key = _normalize(values)
+                if key in keys:
+                    found[fields].setdefault(key, values)
+                if position == 0 and None in keys:
+                    found[fields][None] = values
+            for link, index, linked_rows in outgoing:
+                link.apply(row, index.get(link.lookup_key(position, linked_rows)))
+            data.append(row)
+        with open(path, 'wb') as fp:
+            pickle.dump(data, fp, pickle.HIGHEST_PROTOCOL)
+        return found
+
+    def _generation_order(self):
+        order = []
+        visiting = set()
+
+        def visit(name):
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError('links between fixtures form a cycle at {}'.format(name))
+            visiting.add(name)
+            for link in self._links.get(name, []):
+                if link.linked_fixture not in self._templates:
+                    raise ValueError('linked fixture {} does not exist'.format(link.linked_fixture))
+                visit(link.linked_fixture)
+            visiting.remove(name)
+            order.append(name)
+
+        for name in self._templates:
+            visit(name)
+        return order
+
+    def _links_copy(self):
+        return {key: list(links) for key, links in self._links.items()}
+
+
+class ShardedData(object):
+    def __init__(self, directory, shards, owns_directory):
+        """
+        initializes the result of a sharded generation. Created by ShardedCollection.generate()
+        :param directory: str
+        :param shards: OrderedDict fixture name to tuple of shard paths and row count
+        :param owns_directory: bool remove the directory on cleanup()
+        """
+        self._directory = directory
+        self._shards = shards
+        self._owns_directory = owns_directory
+
+    @property
+    def directory(self):
+        """
+        :return: str
+        """
+        return self._directory
+
+    @property
+    def fixtures(self):
+        """
+        fixture names in load order. Linked fixtures come before the fixtures linking to them.
+        :return: str[]
+        """
+        return list(self._shards)
+
+    def row_count(self, name):
+        """
+        :param name: str
+        :return: int
+        """
+        return self._shards[name][1]
+
+    def shards(self, name):
+        """
+        streams the shards of a fixture from disk, one list of rows at a time
+        :param name: str
+        :return: generator
+        """
+        for path in self._shards[name][0]:
+            with open(path, 'rb') as fp:
+                yield pickle.load(fp)
+
+    def rows(self, name):
+        """
+        streams the rows of a fixture from disk
+        :param name: str
+        :return: generator
+        """
+        for shard in self.shards(name):
+            for row in shard:
+                yield row
+
+    def cleanup(self):
+        """
+        removes the generated shards. Removes the directory if it was created by generate()
+        """
+        if self._owns_directory:
+            rmtree(self._directory, ignore_errors=True)
+            return
+        for paths, _ in self._shards.values():
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
@@ -0,0 +1,138 @@
+
+
+import asyncio
+import gc
+import warnings
+from itertools import count
+from unittest import TestCase
+
+from . import FixtureBuilder, FixtureCollection
+
+
+def run(awaitable):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(awaitable)
+    finally:
+        loop.close()
+
+
+class AsyncValueCreatorTest(TestCase):
+    def setUp(self):
+        self.ids = count(1)
+        self.running = 0
+        self.max_running = 0
+
+    async def allocate_id(self):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return next(self.ids)
+
+    def test_raise_value_error_when_accessing_unresolved_value(self):
+        builder = FixtureBuilder.create({'id': self.allocate_id})
+        with self.assertRaises(ValueError):
+            builder.data
+
+    def test_resolve_coroutine_creators(self):
+        builder = FixtureBuilder.create({'id': self.allocate_id, 'prop1': 'value1'})
+        result = run(builder.aresolve())
+        self.assertIsInstance(result, FixtureBuilder)
+        self.assertEqual({'id': 1, 'prop1': 'value1'}, result.data)
+        self.assertEqual(result.data, result.data)
+
+    def test_copy_creates_new_values_for_sync_and_async_creators(self):
+        sync_ids = count(100)
+        builder = FixtureBuilder.create({'id': self.allocate_id, 'number': lambda: next(sync_ids)})
+        first = run(builder.acopy())
+        second = run(first.acopy())
+        self.assertNotEqual(first.get('id'), second.get('id'))
+        self.assertNotEqual(first.get('number'), second.get('number'))
+
+    def test_resolve_creators_concurrently(self):
+        builder = FixtureBuilder.create({'ids': [self.allocate_id] * 5})
+        run(builder.aresolve())
+        self.assertEqual(5, self.max_running)
+
+    def test_limit_concurrency(self):
+        builder = FixtureBuilder.create({'ids': [self.allocate_id] * 5})
+        result = run(builder.aresolve(concurrency=2))
+        self.assertEqual(2, self.max_running)
+        self.assertEqual([1, 2, 3, 4, 5], sorted(result.get('ids')))
+
+    def test_resolve_collection_data(self):
+        collection = FixtureCollection.create() \
+            .add_fixture('table1', {'id': self.allocate_id}) \
+            .add_fixture('table1', {'id': self.allocate_id}) \
+            .add_fixture('table2', {'attr1': 'attrval1'}) \
+            .add_link('table2.table1_id', 'table1.id=2')
+        data = run(collection.adata(concurrency=1))
+        self.assertEqual([{'id': 1}, {'id': 2}], data['table1'])
+        self.assertEqual([{'attr1': 'attrval1', 'table1_id': 2}], data['table2'])
+        self.assertEqual(1, self.max_running)
+
+    def test_resolve_shared_builder_once(self):
+        builder = FixtureBuilder.create({'id': self.allocate_id})
+        collection = run(FixtureCollection.create()
+                         .add_fixture('table1', builder)
+                         .add_fixture('table2', builder)
+                         .aresolve())
+        self.assertEqual(collection.get_fixture('table1')[0].data, collection.get_fixture('table2')[0].data)
+
+    def test_resolve_creators_returning_awaitables(self):
+        class Allocator(object):
+            async def __call__(inner):
+                return await self.allocate_id()
+
+        builder = FixtureBuilder.create({'id1': lambda: self.allocate_id(), 'id2': Allocator()})
+        self.assertTrue(builder.has('id1'))
+        with self.assertRaises(ValueError):
+            builder.data
+        result = run(builder.aresolve())
+        self.assertEqual([1, 2], sorted(result.data.values()))
+        self.assertEqual(2, len(set(run(result.acopy()).data.values()) - {1, 2}))
+
+    def test_resolve_a_builder_more_than_once(self):
+        builder = FixtureBuilder.create({'id': lambda: self.allocate_id()})
+        self.assertEqual(run(builder.aresolve()).data, run(builder.aresolve()).data)
+
+    def test_raise_value_error_for_concurrency_below_one(self):
+        builder = FixtureBuilder.create({'id': self.allocate_id})
+        with self.assertRaises(ValueError):
+            builder.aresolve(concurrency=0)
+        with self.assertRaises(ValueError):
+            FixtureCollection.create().add_fixture('table1', builder).adata(concurrency=0)
+
+    def test_copy_creators_returning_coroutines_without_leaving_them_unawaited(self):
+        builder = FixtureBuilder.create({'id': lambda: self.allocate_id()})
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            result = run(builder.acopy())
+            gc.collect()
+        self.assertEqual({'id': 1}, result.data)
+        self.assertEqual([], [str(warning.message) for warning in caught])
+
+    def test_call_creator_again_after_a_failed_resolution(self):
+        calls = count()
+
+        async def creator():
+            if next(calls) == 0:
+                raise RuntimeError('creator failed')
+            return 'value1'
+
+        builder = FixtureBuilder.create({'prop1': lambda: creator()})
+        with self.assertRaises(RuntimeError):
+            run(builder.aresolve())
+        self.assertEqual({'prop1': 'value1'}, run(builder.aresolve()).data)
+
+    def test_call_creator_once_for_concurrent_resolutions(self):
+        builder = FixtureBuilder.create({'id': lambda: self.allocate_id(), 'prop1': 'value1'})
+
+        async def resolve():
+            return await asyncio.gather(builder.aresolve(), builder.set('prop1', 'value2').aresolve())
+
+        first, second = run(resolve())
+        self.assertEqual(1, first.get('id'))
+        self.assertEqual(1, second.get('id'))
+        self.assertEqual(2, next(self.ids))
@@ -0,0 +1,90 @@
+
+
+from datetime import datetime
+from io import StringIO
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase
+
+import csv
+import io
+import json
+import sqlite3
+
+from . import FixtureBuilder, FixtureCollection
+from ._export import copy_field, csv_field
+
+
+class FixtureCollectionExportTest(TestCase):
+    def setUp(self):
+        self.directory = mkdtemp()
+        table1 = FixtureBuilder.create({'id': 1, 'prop1': 'value1', 'dict1': {'dictprop1': [1, 2]}})
+        self.collection = FixtureCollection.create() \
+            .add_fixture('table1', table1) \
+            .add_fixture('table1', table1.set('id', 2).set('prop1', 'tab\tnew\nline "quoted", \\')) \
+            .add_fixture('table2', {'attr1': '', 'created': datetime(2017, 2, 1, 4, 5, 6)}) \
+            .add_fixture('table2', {'attr1': None, 'attr2': True}) \
+            .add_link('table2.table1_id', 'table1.id', row_values=[2, 1])
+
+    def tearDown(self):
+        rmtree(self.directory)
+
+    def test_return_columns_in_stable_order(self):
+        self.assertEqual(['id', 'prop1', 'dict1'], self.collection.fixture_columns('table1'))
+        self.assertEqual(['attr1', 'created', 'attr2', 'table1_id'], self.collection.fixture_columns('table2'))
+
+    def test_write_copy_text_format(self):
+        fp = StringIO()
+        self.collection.write_copy('table2', fp)
+        self.assertEqual(
+            '\t2017-02-01 04:05:06\t\\N\t2\n'
+            '\\N\t\\N\tt\t1\n',
+            fp.getvalue()
+        )
+
+    def test_escape_copy_fields(self):
+        self.assertEqual('tab\\tnew\\nline \\\\', copy_field('tab\tnew\nline \\'))
+        self.assertEqual('\\N', copy_field(None))
+        self.assertEqual('{"dictprop1": [1, 2]}', copy_field({'dictprop1': [1, 2]}))
+
+    def test_encode_bytes_as_bytea_hex(self):
+        self.assertEqual('\\\\x6162', copy_field(b'ab'))
+        self.assertEqual('\\x6162', csv_field(bytearray(b'ab')))
+
+    def test_encode_tuples_and_sets_as_json_arrays(self):
+        self.assertEqual('[1, 2]', copy_field((1, 2)))
+        self.assertEqual('"[1, 2]"', csv_field({2, 1}))
+        self.assertEqual('{"tags": ["a", "b"]}', copy_field({'tags': frozenset(['b', 'a'])}))
+
+    def test_raise_value_error_on_nul_characters(self):
+        with self.assertRaises(ValueError):
+            copy_field('nul\x00character')
+        with self.assertRaises(ValueError):
+            csv_field('nul\x00character')
+
+    def test_read_csv_with_csv_module(self):
+        fp = StringIO(newline='')
+        self.collection.write_csv('table1', fp)
+        fp.seek(0)
+        rows = list(csv.DictReader(fp))
+        self.assertEqual(['1', '2'], [row['id'] for row in rows])
+        self.assertEqual('tab\tnew\nline "quoted", \\', rows[1]['prop1'])
+        self.assertEqual({'dictprop1': [1, 2]}, json.loads(rows[0]['dict1']))
+
+    def test_load_csv_dir_into_sqlite(self):
+        files = self.collection.write_csv_dir(self.directory)
+        connection = sqlite3.connect(':memory:')
+        for name, path in sorted(files.items()):
+            with io.open(path, encoding='utf-8', newline='') as fp:
+                reader = csv.reader(fp)
+                columns = next(reader)
+                connection.execute('CREATE TABLE {} ({})'.format(name, ', '.join(columns)))
+                connection.executemany(
+                    'INSERT INTO {} VALUES ({})'.format(name, ', '.join('?' * len(columns))),
+                    reader
+                )
+        result = connection.execute(
+            'SELECT table1.prop1 FROM table2 JOIN table1 ON table1.id = table2.table1_id WHERE table2.attr2 = ?',
+            ('t',)
+        ).fetchall()
+        self.assertEqual([('value1',)], result)
@@ -4,11 +4,13 @@ from json import loads as json_decode
 from unittest import TestCase
 from copy import deepcopy
 
+import pickle
+
 from datetime import datetime
 
 from faker import Faker
 
-from . import FixtureBuilder, FixtureCollection
+from . import FixtureBuilder, FixtureCollection, MissingPropertyError
 
 
 class FixtureBuilderTest(TestCase):
@@ -234,6 +236,43 @@ class FixtureBuilderTest(TestCase):
         with self.assertRaises(NotImplementedError):
             self.builder.with_dict('dict1').copy()
 
+    def test_missing_property_error_describes_the_missing_key(self):
+        with self.assertRaises(MissingPropertyError) as context:
+            self.builder.with_dict_list_element('list2', 0).set('missing_prop1', 'some value')
+        self.assertEqual(['list2', 0], context.exception.path)
+        self.assertEqual('missing_prop1', context.exception.key)
+        self.assertEqual(['listdictprop1'], context.exception.available_keys)
+        self.assertIn('list2.0', str(context.exception))
+
+    def test_missing_property_error_does_not_encode_data(self):
+        builder = FixtureBuilder.create({'prop{}'.format(i): datetime.now() for i in range(20)})
+        with self.assertRaises(KeyError) as context:
+            builder.append('missing_prop1', 'some value')
+        self.assertIn('(10 more)', str(context.exception))
+
+    def test_missing_property_error_can_be_pickled(self):
+        builder = FixtureBuilder.create({'prop1': lambda: 'value1', 'dict1': {'dictprop1': 1}})
+        with self.assertRaises(MissingPropertyError) as context:
+            builder.with_dict('dict1').set('missing_prop1', 'some value')
+        error = pickle.loads(pickle.dumps(context.exception))
+        self.assertIsInstance(error, MissingPropertyError)
+        self.assertEqual(['dict1'], error.path)
+        self.assertEqual('missing_prop1', error.key)
+        self.assertEqual(['dictprop1'], error.available_keys)
+        self.assertEqual(str(context.exception), str(error))
+
+    def test_check_if_property_exists(self):
+        self.assertTrue(self.builder.has('prop1'))
+        self.assertTrue(self.builder.has('dict1.dictprop1'))
+        self.assertTrue(self.builder.has('list2.1.listdictprop3'))
+        self.assertTrue(self.builder.has(['list2', -1, 'listdictprop2']))
+        self.assertFalse(self.builder.has('missing_prop1'))
+        self.assertFalse(self.builder.has('dict1.missing_prop1'))
+        self.assertFalse(self.builder.has('list2.5.listdictprop1'))
+        self.assertFalse(self.builder.has('prop1.missing_prop1'))
+        self.assertFalse(self.builder.has(['list1', None]))
+        self.assertFalse(self.builder.has([['prop1']]))
+
 class FixtureCollectionTest(TestCase):
     DATA1 = {
         'prop1': 'value1',
@@ -426,3 +465,69 @@ class FixtureCollectionTest(TestCase):
     def test_raise_value_error_if_linked_field_is_invalid(self):
         with self.assertRaises(ValueError):
             self.collection.add_link('table2.field1', 'invalid')
+
+    def test_create_link_on_composite_key(self):
+        first_row = FixtureBuilder.create({'id': 1, 'version': 1})
+        data = self.collection \
+            .add_fixture('table1', first_row) \
+            .add_fixture('table1', first_row.set('version', 2)) \
+            .add_fixture('table1', first_row.set('id', 2)) \
+            .add_fixture('table2', self.builder2) \
+            .add_link('table2.table1_id,table1_version', 'table1.id,version=1,2') \
+            .data
+        self.assertEqual(1, data['table2'][0]['table1_id'])
+        self.assertEqual(2, data['table2'][0]['table1_version'])
+
+    def test_create_link_with_a_target_per_row(self):
+        data = self.collection \
+            .add_fixture('table1', {'id': 1}) \
+            .add_fixture('table1', {'id': 2}) \
+            .add_fixture('table2', self.builder2) \
+            .add_fixture('table2', self.builder2) \
+            .add_fixture('table2', self.builder2) \
+            .add_link('table2.table1_id', 'table1.id', row_values=[2, 1, 3]) \
+            .data
+        self.assertEqual([2, 1, None], [row['table1_id'] for row in data['table2']])
+
+    def test_raise_value_error_if_row_values_do_not_match_rows(self):
+        collection = self.collection \
+            .add_fixture('table1', {'id': 1}) \
+            .add_fixture('table2', self.builder2) \
+            .add_link('table2.table1_id', 'table1.id', row_values=[1, 1])
+        with self.assertRaises(ValueError):
+            collection.data
+
+    def test_raise_value_error_if_link_field_counts_differ(self):
+        with self.assertRaises(ValueError):
+            self.collection.add_link('table2.field1,field2', 'table1.id=1')
+
+    def test_set_none_if_no_linked_row_matches(self):
+        data = self.collection \
+            .add_fixture('table1', self.builder1) \
+            .add_fixture('table1', self.builder1) \
+            .add_fixture('table2', self.builder2) \
+            .add_link('table2.table1_id', 'table1.prop1=missing') \
+            .data
+        self.assertIsNone(data['table2'][0]['table1_id'])
+
+    def test_raise_missing_property_error_if_linked_field_is_missing(self):
+        collection = self.collection \
+            .add_fixture('table1', self.builder1) \
+            .add_fixture('table1', self.builder1) \
+            .add_fixture('table2', self.builder2) \
+            .add_link('table2.table1_id', 'table1.missing_prop1=None')
+        with self.assertRaises(MissingPropertyError) as context:
+            collection.data
+        self.assertEqual(['table1', 0], context.exception.path)
+        self.assertEqual('missing_prop1', context.exception.key)
+
+    def test_linked_dicts_and_lists_are_independent_copies(self):
+        data = self.collection \
+            .add_fixture('table1', self.builder1) \
+            .add_fixture('table2', self.builder2) \
+            .add_link('table2.list1', 'table1.list1') \
+            .add_link('table2.dict1', 'table1.dict1') \
+            .data
+        data['table2'][0]['list1'].append('new value')
+        data['table2'][0]['dict1']['dictprop1'] = 'new value'
+        self.assertEqual(self.DATA1, data['table1'][0])
@@ -0,0 +1,222 @@
+
+
+from copy import copy, deepcopy
+from datetime import datetime, timedelta, timezone
+from itertools import count
+from unittest import TestCase
+
+from . import FixtureBuilder, FixtureCollection
+from .pytest_plugin import FixtureCache, fixture_data, _freeze, _thaw
+
+pytest_plugins = ['pytester']
+
+
+class FixtureCacheTest(TestCase):
+    DATA = {
+        'prop1': 'value1',
+        'dict1': {'dictprop1': 'dictvalue1'},
+        'list1': ['listvalue1'],
+    }
+
+    def setUp(self):
+        self.cache = FixtureCache()
+        self.calls = 0
+
+    def factory(self):
+        self.calls += 1
+        return FixtureBuilder.create(self.DATA)
+
+    def test_return_builder_data(self):
+        self.assertDictEqual(self.DATA, self.cache.get('fixture1', None, self.factory))
+
+    def test_call_factory_once_per_scope(self):
+        self.cache.get('fixture1', 'module1', self.factory)
+        self.cache.get('fixture1', 'module1', self.factory)
+        self.assertEqual(1, self.calls)
+        self.cache.get('fixture1', 'module2', self.factory)
+        self.assertEqual(2, self.calls)
+
+    def test_share_data_between_structurally_identical_builders(self):
+        builder = FixtureBuilder.create(self.DATA)
+        data1 = self.cache.get('fixture1', None, lambda: builder)
+        data2 = self.cache.get('fixture2', None, lambda: builder.set('prop1', builder.get('prop1')))
+        self.assertIs(data1, data2)
+        self.assertEqual(1, self.cache.stats['fixture2'].hits)
+
+    def test_share_data_between_builders_with_equal_values(self):
+        data1 = self.cache.get('fixture1', None, lambda: FixtureBuilder.create({'prop1': int('1000'), 1: 'a'}))
+        data2 = self.cache.get('fixture2', None, lambda: FixtureBuilder.create({'prop1': 1000, 1: ''.join('a')}))
+        self.assertIs(data1, data2)
+
+    def test_build_separately_when_value_types_differ(self):
+        data1 = self.cache.get('fixture1', None, lambda: FixtureBuilder.create({'prop1': 1}))
+        data2 = self.cache.get('fixture2', None, lambda: FixtureBuilder.create({'prop1': True}))
+        self.assertIsNot(data1, data2)
+
+    def test_build_separately_when_nested_value_types_differ(self):
+        for value1, value2 in [
+            ((1, 2), (True, 2.0)),
+            (0.0, -0.0),
+            (datetime(2017, 1, 1, tzinfo=timezone.utc), datetime(2017, 1, 1, 1, tzinfo=timezone(timedelta(hours=1)))),
+        ]:
+            data1 = self.cache.get('fixture1', value1, lambda: FixtureBuilder.create({'prop1': value1}))
+            data2 = self.cache.get('fixture2', value1, lambda: FixtureBuilder.create({'prop1': value2}))
+            self.assertIsNot(data1, data2)
+            self.assertEqual(repr(value2), repr(data2['prop1']))
+
+    def test_build_separately_when_factories_differ(self):
+        data1 = self.cache.get('fixture1', None, lambda: FixtureBuilder.create({'prop1': 'value1'}))
+        data2 = self.cache.get('fixture1', None, lambda: FixtureBuilder.create({'prop1': 'value2'}))
+        self.assertEqual('value1', data1['prop1'])
+        self.assertEqual('value2', data2['prop1'])
+
+    def test_build_separately_when_values_differ(self):
+        numbers = count()
+        builder = FixtureBuilder.create({'prop1': lambda: next(numbers)})
+        data1 = self.cache.get('fixture1', None, lambda: builder)
+        data2 = self.cache.get('fixture2', None, builder.copy)
+        self.assertIsNot(data1, data2)
+
+    def test_cache_collection_data(self):
+        collection = FixtureCollection.create() \
+            .add_fixture('table1', self.DATA) \
+            .add_fixture('table2', {'attr1': 'attrval1'}) \
+            .add_link('table2.table1_id', 'table1.prop1')
+        data = self.cache.get('fixture1', None, lambda: collection)
+        self.assertEqual('value1', data['table2'][0]['table1_id'])
+        self.assertEqual(1, self.cache.stats['fixture1'].builds)
+
+    def test_raise_type_error_if_factory_returns_no_builder(self):
+        with self.assertRaises(TypeError):
+            self.cache.get('fixture1', None, lambda: self.DATA)
+
+    def test_cached_data_is_read_only(self):
+        data = self.cache.get('fixture1', None, self.factory)
+        with self.assertRaises(TypeError):
+            data['prop1'] = 'new value'
+        with self.assertRaises(TypeError):
+            data['list1'].append('new value')
+        with self.assertRaises(TypeError):
+            data['list1'].clear()
+
+    def test_freeze_sets_and_bytearrays(self):
+        data = _freeze({'set1': {1, 2}, 'bytes1': bytearray(b'ab')})
+        self.assertEqual(frozenset([1, 2]), data['set1'])
+        self.assertEqual(b'ab', data['bytes1'])
+
+    def test_return_a_modifiable_copy(self):
+        data = self.cache.get('fixture1', None, self.factory, copy=True)
+        data['list1'].append('new value')
+        self.assertEqual(['listvalue1'], self.cache.get('fixture1', None, self.factory, copy=True)['list1'])
+
+    def test_drop_data_when_the_last_scope_is_evicted(self):
+        data1 = self.cache.get('fixture1', 'module1', self.factory)
+        self.cache.get('fixture1', 'module2', self.factory)
+        self.cache.evict('fixture1', 'module1', self.factory)
+        self.assertIs(data1, self.cache.get('fixture1', 'module2', self.factory))
+        self.cache.evict('fixture1', 'module2', self.factory)
+        self.assertFalse(self.cache.contains('fixture1', 'module2', self.factory))
+        self.assertIsNot(data1, self.cache.get('fixture1', 'module2', self.factory))
+
+    def test_copied_read_only_data_is_modifiable(self):
+        data = self.cache.get('fixture1', None, self.factory)
+        modifiable = deepcopy(data)
+        modifiable['list1'].append('new value')
+        modifiable['prop1'] = 'new value'
+        self.assertDictEqual(self.DATA, data)
+        shallow = copy(data)
+        shallow['prop1'] = 'new value'
+        self.assertEqual('value1', data['prop1'])
+        with self.assertRaises(TypeError):
+            data |= {'prop1': 'new value'}
+
+    def test_thawed_data_is_an_independent_copy(self):
+        frozen = _freeze(self.DATA)
+        data = _thaw(frozen)
+        data['dict1']['dictprop1'] = 'new value'
+        data['list1'].append('new value')
+        self.assertDictEqual(self.DATA, frozen)
+
+    def test_raise_value_error_for_unsupported_scope(self):
+        with self.assertRaises(ValueError):
+            fixture_data('fixture1', self.factory, scope='function')
+
+
+PLUGIN_TEST_MODULE = """
+from fixturebuilder import FixtureBuilder
+from fixturebuilder.pytest_plugin import fixture_data
+
+calls = []
+
+def factory():
+    calls.append(1)
+    return FixtureBuilder.create({'prop1': 'value1', 'list1': ['listvalue1']})
+
+module_data = fixture_data('module_data', factory, scope='module')
+class_data = fixture_data('class_data', factory, scope='class')
+view_data = fixture_data('view_data', factory, copy=False)
+
+def test_copy(module_data):
+    module_data['list1'].append('new value')
+
+def test_copy_is_isolated(module_data):
+    assert module_data['list1'] == ['listvalue1']
+
+def test_class_scope_outside_a_class_is_module_scope(class_data):
+    assert class_data['prop1'] == 'value1'
+
+class TestClassScope(object):
+    def test_class_data(self, class_data):
+        assert class_data['prop1'] == 'value1'
+
+def test_view_is_read_only(view_data):
+    import pytest
+    with pytest.raises(TypeError):
+        view_data['list1'].append('new value')
+"""
+
+
+def test_provide_fixture_data_inside_pytest(pytester):
+    pytester.makepyfile(test_one=PLUGIN_TEST_MODULE, test_two=PLUGIN_TEST_MODULE)
+    result = pytester.runpytest('-p', 'fixturebuilder.pytest_plugin')
+    result.assert_outcomes(passed=10)
+    result.stdout.fnmatch_lines([
+        '*fixturebuilder build times*',
+        'class_data * builds: 0  cache hits: 4',
+        'module_data * builds: 1  cache hits: 3',
+        'view_data * builds: 0  cache hits: 2',
+    ])
+
+
+def test_evict_module_scoped_fixtures_after_the_module(pytester):
+    pytester.makeconftest("""
+from fixturebuilder import FixtureBuilder
+from fixturebuilder.pytest_plugin import fixture_data
+
+module_data = fixture_data('module_data', lambda: FixtureBuilder.create({'prop1': 'value1'}), scope='module')
+""")
+    pytester.makepyfile(
+        test_one="def test_one(module_data):\n    pass\n",
+        test_two="""
+def test_two(module_data, request):
+    assert [key[:2] for key in request.config._fixturebuilder_cache._sources] == [('module_data', 'test_two')]
+""",
+    )
+    result = pytester.runpytest('-p', 'fixturebuilder.pytest_plugin')
+    result.assert_outcomes(passed=2)
+
+
+def test_separate_fixtures_with_the_same_name_from_different_conftests(pytester):
+    for value in ('a', 'b'):
+        pytester.mkpydir(value).joinpath('conftest.py').write_text("""
+from fixturebuilder import FixtureBuilder
+from fixturebuilder.pytest_plugin import fixture_data
+
+data = fixture_data('data', lambda: FixtureBuilder.create({{'prop1': '{0}'}}))
+""".format(value))
+        pytester.path.joinpath(value, 'test_{}.py'.format(value)).write_text("""
+def test_data(data):
+    assert data['prop1'] == '{}'
+""".format(value))
+    result = pytester.runpytest('-p', 'fixturebuilder.pytest_plugin')
+    result.assert_outcomes(passed=2)
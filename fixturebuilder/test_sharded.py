@@ -0,0 +1,127 @@
+
+
+from itertools import count
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase
+from unittest.mock import patch
+
+import os
+
+from . import FixtureBuilder, MissingPropertyError
+from .sharded import ShardedCollection
+
+
+class ShardedCollectionTest(TestCase):
+    def setUp(self):
+        self.directory = mkdtemp()
+        self.ids = count(1)
+        self.table1 = FixtureBuilder.create({'id': lambda: next(self.ids), 'prop1': 'value1'})
+        self.table2 = {'attr1': 'attrval1'}
+        self.collection = ShardedCollection.create(shard_size=4)
+
+    def tearDown(self):
+        rmtree(self.directory)
+
+    def test_generate_rows_in_shards(self):
+        data = self.collection \
+            .add_template('table1', self.table1, 10) \
+            .generate(self.directory)
+        shards = list(data.shards('table1'))
+        self.assertEqual([4, 4, 2], [len(shard) for shard in shards])
+        self.assertEqual(10, data.row_count('table1'))
+        self.assertEqual(list(range(2, 12)), [row['id'] for row in data.rows('table1')])
+        self.assertEqual(3, len(os.listdir(os.path.join(self.directory, 'table1'))))
+
+    def test_leave_original_collection_unchanged(self):
+        self.collection.add_template('table1', self.table1, 10)
+        self.assertEqual([], self.collection.generate(self.directory).fixtures)
+
+    def test_resolve_links_across_shards(self):
+        data = self.collection \
+            .add_template('table2', self.table2, 5) \
+            .add_template('table1', self.table1, 10) \
+            .add_link('table2.table1_id', 'table1.id=9') \
+            .generate(self.directory)
+        self.assertEqual(['table1', 'table2'], data.fixtures)
+        self.assertEqual([9] * 5, [row['table1_id'] for row in data.rows('table2')])
+
+    def test_link_to_single_row_fixture(self):
+        data = self.collection \
+            .add_template('table1', self.table1, 1) \
+            .add_template('table2', self.table2, 5) \
+            .add_link('table2.table1_id', 'table1.id') \
+            .generate(self.directory)
+        self.assertEqual([2] * 5, [row['table1_id'] for row in data.rows('table2')])
+
+    def test_resolve_links_with_a_target_per_row(self):
+        data = self.collection \
+            .add_template('table1', self.table1, 10) \
+            .add_template('table2', self.table2, 6) \
+            .add_link('table2.table1_id', 'table1.id', row_values=[11, 10, 9, 8, 7, 100]) \
+            .generate(self.directory)
+        self.assertEqual([11, 10, 9, 8, 7, None], [row['table1_id'] for row in data.rows('table2')])
+
+    def test_resolve_links_with_a_callable_target_per_row(self):
+        data = self.collection \
+            .add_template('table1', self.table1, 10) \
+            .add_template('table2', self.table2, 6) \
+            .add_link('table2.table1_id', 'table1.id', row_values=lambda position: position % 3 + 2) \
+            .generate(self.directory)
+        self.assertEqual([2, 3, 4, 2, 3, 4], [row['table1_id'] for row in data.rows('table2')])
+
+    def test_generate_into_temporary_directory(self):
+        data = self.collection.add_template('table1', self.table1, 10).generate()
+        self.assertTrue(os.path.isdir(data.directory))
+        data.cleanup()
+        self.assertFalse(os.path.exists(data.directory))
+
+    def test_remove_temporary_directory_if_generation_fails(self):
+        calls = count()
+
+        def creator():
+            if next(calls) > 2:
+                raise RuntimeError('creator failed')
+            return 1
+
+        collection = self.collection.add_template('table1', {'id': creator}, 10)
+        created = []
+
+        def create_directory(**kwargs):
+            created.append(mkdtemp())
+            return created[-1]
+
+        with patch('fixturebuilder.sharded.mkdtemp', side_effect=create_directory):
+            with self.assertRaises(RuntimeError):
+                collection.generate()
+        self.assertFalse(os.path.exists(created[0]))
+
+    def test_raise_value_error_if_links_form_a_cycle(self):
+        collection = self.collection \
+            .add_template('table1', self.table1, 1) \
+            .add_template('table2', self.table2, 1) \
+            .add_link('table1.table2_id', 'table2.attr1') \
+            .add_link('table2.table1_id', 'table1.id')
+        with self.assertRaises(ValueError):
+            collection.generate(self.directory)
+
+    def test_raise_value_error_if_linked_fixture_is_missing(self):
+        collection = self.collection \
+            .add_template('table2', self.table2, 1) \
+            .add_link('table2.table1_id', 'table1.id')
+        with self.assertRaises(ValueError):
+            collection.generate(self.directory)
+
+    def test_raise_missing_property_error_if_linked_field_is_missing(self):
+        collection = self.collection \
+            .add_template('table1', self.table1, 3) \
+            .add_template('table2', self.table2, 1) \
+            .add_link('table2.table1_id', 'table1.missing_prop1=None')
+        with self.assertRaises(MissingPropertyError):
+            collection.generate(self.directory)
+
+    def test_raise_value_error_if_template_exists(self):
+        with self.assertRaises(ValueError):
+            self.collection \
+                .add_template('table1', self.table1, 1) \
+                .add_template('table1', self.table1, 1)